@@ -1,15 +1,31 @@
 # ETL Pipeline to Google Cloud Platform
 
 import os  # For environment variable management
+import numpy as np  # For vectorized arithmetic on column arrays
 import pandas as pd  # For data manipulation and processing
 from google.cloud import storage, bigquery  # Google Cloud client libraries
+from google.cloud.exceptions import Conflict, NotFound  # Errors for already existing or missing resources
+import google.auth  # For loading credentials shared by all clients
+from google.auth.transport.requests import AuthorizedSession  # Authenticated HTTP session for client requests
+from requests.adapters import HTTPAdapter  # For sizing the HTTP connection pool
 from datetime import datetime  # For timestamping files and operations
 import json  # For handling JSON data structures
+import uuid  # For run-specific resource names
+from concurrent.futures import ThreadPoolExecutor  # For overlapping independent network calls
+import pyarrow as pa  # Columnar in-memory format shared by pandas and Parquet
+import pyarrow.csv as pacsv  # Multithreaded CSV parser with Arrow-backed columns
+import pyarrow.parquet as pq  # Parquet writer for compact columnar uploads
+
+try:
+    from google.cloud import bigquery_storage_v1  # BigQuery Storage Write API client
+    from google.cloud.bigquery_storage_v1 import types as bqs_types, writer as bqs_writer  # Request types and append stream helper
+except ImportError:  # Storage Write API path is optional and disabled without the package
+    bigquery_storage_v1 = None
 
 class CloudETLPipeline:
     
     
-    def __init__(self, credentials_file):
+    def __init__(self, credentials_file, use_storage_write_api=False):
         """Initialize the pipeline with Google Cloud credentials"""
         print("Initializing Google Cloud ETL Pipeline...")
         
@@ -19,39 +35,84 @@ class CloudETLPipeline:
         # Define project configuration
         self.project_id = "symbolic-axe-474621-e8"  # Google Cloud project identifier
         self.bucket_name = f"pedro-etl-{datetime.now().strftime('%Y%m%d')}"  # Unique bucket name with date
+        self.dataset_id = "pedro_etl_demo"  # Dataset name for organizing tables
+        self.table_id = "sales_data"  # Table name for storing sales data
+        self.table_schema = [  # Explicit column types for the sales table instead of schema detection
+            bigquery.SchemaField("date", "DATE"),
+            bigquery.SchemaField("product", "STRING"),
+            bigquery.SchemaField("quantity", "INT64"),
+            bigquery.SchemaField("sales_amount", "FLOAT64"),
+            bigquery.SchemaField("customer_region", "STRING"),
+            bigquery.SchemaField("month", "STRING"),
+            bigquery.SchemaField("total_value", "FLOAT64"),
+        ]
+        self.arrow_schema = pa.schema([  # Matching Arrow column types, shared by the CSV reader and the Parquet upload
+            ("date", pa.date32()),  # Parse ISO dates in the C++ reader instead of in pandas
+            ("product", pa.dictionary(pa.int32(), pa.string())),  # Low-cardinality text stored once per value plus integer codes
+            ("quantity", pa.int32()),  # 32-bit width halves bytes per value and fails loudly on overflow
+            ("sales_amount", pa.float64()),
+            ("customer_region", pa.dictionary(pa.int32(), pa.string())),
+            ("month", pa.string()),  # Derived in transform_data
+            ("total_value", pa.float64()),  # Derived in transform_data
+        ])
+        
+        # Stream rows through the Storage Write API instead of a batch load job when requested
+        if use_storage_write_api and bigquery_storage_v1 is None:
+            raise ImportError("google-cloud-bigquery-storage is required for use_storage_write_api=True")
+        self.use_storage_write_api = use_storage_write_api
+        
+        # Share one pooled HTTP session so both clients reuse open connections
+        credentials, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])  # Load service account credentials
+        session = AuthorizedSession(credentials)  # Session that adds auth headers to every request
+        session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))  # Keep up to 16 connections alive per host
         
         # Initialize Google Cloud service clients
-        self.storage_client = storage.Client(project=self.project_id)  # Cloud Storage client for file operations
-        self.bigquery_client = bigquery.Client(project=self.project_id)  # BigQuery client for data warehouse operations
+        self.storage_client = storage.Client(project=self.project_id, credentials=credentials, _http=session)  # Cloud Storage client for file operations
+        self.bigquery_client = bigquery.Client(project=self.project_id, credentials=credentials, _http=session)  # BigQuery client for data warehouse operations
         
         print(f"Connected to Google Cloud project: {self.project_id}")
     
     def extract_data(self, file_path):
-        """Extract data from CSV file and perform initial validation"""
+        """Extract data from CSV file in chunks and perform initial validation"""
         print("Starting data extraction phase...")
         
-        # Read CSV file into pandas DataFrame
-        df = pd.read_csv(file_path)  # Load data from file into memory
-        print(f"Successfully loaded {len(df)} rows from {file_path}")
+        # Stream CSV file into pandas DataFrames one chunk at a time
+        read_options = pacsv.ReadOptions(use_threads=True, block_size=64 << 20)  # Parse in 64 MB blocks across all cores
+        convert_options = pacsv.ConvertOptions(  # Declare known column types so the parser converts them directly
+            strings_can_be_null=True,  # Read blank and NA/NULL text cells as missing values, like pandas
+            column_types=self.arrow_schema,  # Derived columns missing from the file are ignored
+        )
+        reader = pacsv.open_csv(file_path, read_options=read_options, convert_options=convert_options)  # Incremental reader yielding Arrow record batches
+        chunks = (batch.to_pandas(split_blocks=True, self_destruct=True, types_mapper=pd.ArrowDtype) for batch in reader)  # Convert without copying numeric columns
         
-        # Display basic information about the dataset
-        print(f"Dataset shape: {df.shape}")  # Show number of rows and columns
-        print(f"Columns: {list(df.columns)}")  # List all column names
+        total_rows = 0  # Running count of rows read so far
+        for i, df in enumerate(chunks):  # Hand each chunk to the next step before reading the following one
+            total_rows += len(df)
+            if i == 0:  # Display basic information about the dataset once
+                print(f"Columns: {list(df.columns)}")  # List all column names
+            print(f"Read chunk {i + 1}: {len(df)} rows")  # Show number of rows in this chunk
+            yield df  # Return DataFrame chunk for next processing step
         
-        return df  # Return DataFrame for next processing step
+        print(f"Successfully loaded {total_rows} rows from {file_path}")
     
     def transform_data(self, df):
         """Transform and enrich the data with business logic"""
         print("Starting data transformation phase...")
         
         # Add calculated fields for business analysis
-        df['month'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m')  # Extract month from date for time series analysis
-        df['total_value'] = df['sales_amount'] * df['quantity']  # Calculate total transaction value
+        dates = pa.array(df['date']).to_numpy(zero_copy_only=False)  # Dates already parsed by the reader, as datetime64[D] with NaT for missing values
+        months = dates.astype('datetime64[M]')  # Truncate to month in one numpy cast
+        month_values = pa.array(months.astype(str), mask=np.isnat(months))  # Format as YYYY-MM straight into an Arrow string buffer, missing dates as null
+        df['month'] = pd.Series(pd.arrays.ArrowExtensionArray(month_values), index=df.index)  # Extract month for time series analysis without Python string objects
+        sales_amount = df['sales_amount'].to_numpy(dtype='float64', na_value=np.nan)  # Raw array without index alignment
+        quantity = df['quantity'].to_numpy(dtype='float64', na_value=np.nan)  # Raw array without index alignment
+        df['total_value'] = np.multiply(sales_amount, quantity)  # Calculate total transaction value
         
         # Data quality validation
-        null_counts = df.isnull().sum()  # Check for missing values in each column
-        if null_counts.sum() > 0:  # If any null values found
-            print(f"Warning: Found {null_counts.sum()} null values")
+        null_total = int(df.isna().to_numpy().sum())  # Count missing values across all columns in a single pass
+        if null_total > 0:  # If any null values found
+            null_counts = df.isna().sum()  # Break down missing values by column only when there are some
+            print(f"Warning: Found {null_total} null values ({null_counts[null_counts > 0].to_dict()})")
         
         # Generate summary statistics for validation
         total_sales = df['sales_amount'].sum()  # Calculate total sales amount
@@ -60,115 +121,246 @@ class CloudETLPipeline:
         
         return df  # Return transformed DataFrame
     
-    def load_to_storage(self, df):
-        """Upload processed data to Google Cloud Storage"""
+    def prefetch_chunks(self, chunks):
+        """Prepare the next chunk on a background thread while the caller uploads the current one"""
+        done = object()  # Marker returned after the last chunk
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:  # Single producer thread keeps chunks in order
+            future = executor.submit(next, chunks, done)  # Start reading and transforming the first chunk
+            while (chunk := future.result()) is not done:  # Wait for chunk, re-raising any producer error
+                future = executor.submit(next, chunks, done)  # Prepare the following chunk, so at most two are in memory
+                yield chunk
+    
+    def load_to_storage(self, chunks):
+        """Stream processed data chunks to Google Cloud Storage and return the object URI"""
         print("Loading data to Cloud Storage...")
         
         try:
             # Create or get storage bucket
-            bucket = self.storage_client.bucket(self.bucket_name)  # Reference to storage bucket
-            if not bucket.exists():  # Check if bucket already exists
+            try:
                 bucket = self.storage_client.create_bucket(self.bucket_name, location="US")  # Create new bucket in US region
                 print(f"Created new storage bucket: {self.bucket_name}")
-            else:
+            except Conflict:  # If bucket already exists
+                bucket = self.storage_client.bucket(self.bucket_name)  # Reference to storage bucket, no request needed
                 print(f"Using existing storage bucket: {self.bucket_name}")
             
             # Generate unique filename with timestamp
-            blob_name = f"sales_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"  # Create timestamped filename
+            blob_name = f"sales_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"  # Create timestamped filename
             blob = bucket.blob(blob_name)  # Create blob reference for file upload
             
-            # Upload DataFrame as CSV to cloud storage
-            csv_data = df.to_csv(index=False)  # Convert DataFrame to CSV string format
-            blob.upload_from_string(csv_data, content_type='text/csv')  # Upload CSV data to cloud
+            # Stream each DataFrame chunk as a Snappy-compressed Parquet row group into a single cloud storage object
+            writer = None  # Parquet writer is created once the first chunk defines the schema
+            with blob.open("wb", ignore_flush=True, content_type='application/octet-stream', chunk_size=8 * 1024 * 1024) as fh:  # Resumable upload buffering only 8 MB at a time
+                for df in chunks:  # Iterate through processed chunks
+                    schema = writer.schema if writer is not None else None  # Keep column types identical across row groups
+                    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)  # Convert chunk to Arrow columns
+                    if writer is None:
+                        writer = pq.ParquetWriter(fh, table.schema, compression='snappy')  # Open Parquet stream on the upload handle
+                    writer.write_table(table)  # Append chunk as a new row group
+                if writer is None:  # Header-only source produced no chunks
+                    writer = pq.ParquetWriter(fh, self.arrow_schema, compression='snappy')  # Upload a valid Parquet file with zero rows
+                writer.close()  # Write Parquet footer before the upload is finalized
             print(f"Successfully uploaded file: {blob_name}")
             
+            return f"gs://{self.bucket_name}/{blob_name}"  # Location BigQuery loads the data from
+            
         except Exception as e:  # Handle any upload errors
             print(f"Error uploading to Cloud Storage: {e}")
             raise  # Re-raise exception to stop pipeline
     
-    def load_to_bigquery(self, df):
-        """Load data into BigQuery data warehouse for analytics"""
+    def prepare_dataset(self):
+        """Create the BigQuery dataset if needed and return a reference to it"""
+        dataset_ref = self.bigquery_client.dataset(self.dataset_id)  # Reference to dataset
+        
+        try:
+            dataset = self.bigquery_client.get_dataset(dataset_ref)  # Try to get existing dataset
+            print(f"Using existing BigQuery dataset: {self.dataset_id}")
+        except NotFound:  # If dataset doesn't exist
+            dataset = bigquery.Dataset(dataset_ref)  # Create new dataset object
+            dataset.location = "US"  # Set geographic location for data storage
+            dataset = self.bigquery_client.create_dataset(dataset)  # Create dataset in BigQuery
+            print(f"Created new BigQuery dataset: {self.dataset_id}")
+        
+        return dataset_ref  # Return reference for table operations
+    
+    def load_to_bigquery(self, source_uri, dataset_ref):
+        """Load the uploaded Parquet object into BigQuery data warehouse for analytics"""
         print("Loading data to BigQuery data warehouse...")
         
         try:
-            # Create or get BigQuery dataset
-            dataset_id = "pedro_etl_demo"  # Dataset name for organizing tables
-            dataset_ref = self.bigquery_client.dataset(dataset_id)  # Reference to dataset
-            
-            try:
-                dataset = self.bigquery_client.get_dataset(dataset_ref)  # Try to get existing dataset
-                print(f"Using existing BigQuery dataset: {dataset_id}")
-            except:  # If dataset doesn't exist
-                dataset = bigquery.Dataset(dataset_ref)  # Create new dataset object
-                dataset.location = "US"  # Set geographic location for data storage
-                dataset = self.bigquery_client.create_dataset(dataset)  # Create dataset in BigQuery
-                print(f"Created new BigQuery dataset: {dataset_id}")
-            
-            # Create table and load data
-            table_id = "sales_data"  # Table name for storing sales data
-            table_ref = dataset_ref.table(table_id)  # Reference to specific table
+            table_ref = dataset_ref.table(self.table_id)  # Reference to specific table
             
             # Configure data loading job
             job_config = bigquery.LoadJobConfig(  # Set up load job parameters
-                write_disposition="WRITE_TRUNCATE",  # Replace existing data completely
-                autodetect=True  # Automatically detect schema from data
+                schema=self.table_schema,  # Use known column types
+                source_format=bigquery.SourceFormat.PARQUET,  # Read the columnar file written to Cloud Storage
+                write_disposition="WRITE_TRUNCATE"  # Replace existing data completely
             )
             
-            # Execute data loading job
-            job = self.bigquery_client.load_table_from_dataframe(df, table_ref, job_config=job_config)  # Start load job
+            # Execute data loading job directly from Cloud Storage
+            job = self.bigquery_client.load_table_from_uri(source_uri, table_ref, job_config=job_config)  # Start load job
             job.result()  # Wait for job completion and check for errors
             
-            print(f"Successfully loaded {len(df)} rows to BigQuery table: {table_id}")
+            print(f"Successfully loaded {job.output_rows} rows to BigQuery table: {self.table_id}")
             
         except Exception as e:  # Handle any BigQuery errors
             print(f"Error loading to BigQuery: {e}")
             raise  # Re-raise exception to stop pipeline
     
+    def stream_to_bigquery(self, chunks, dataset_future, write_session):
+        """Append data chunks to a staging table through the Storage Write API, passing each chunk on"""
+        print("Streaming data to BigQuery through the Storage Write API...")
+        
+        try:
+            write_client = bigquery_storage_v1.BigQueryWriteClient()  # Storage Write API client
+            staging_id = f"{self.table_id}_staging_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"  # Run-specific staging table, so concurrent runs never share one
+            parent = write_client.table_path(self.project_id, self.dataset_id, staging_id)  # Fully qualified staging table path
+            
+            write_stream = None  # Pending stream is opened once the first chunk defines the schema
+            append_stream = None  # Connection used to send rows to the pending stream
+            total_rows = 0  # Running count of rows appended so far
+            for df in chunks:  # Iterate through processed chunks
+                schema = arrow_schema if append_stream is not None else None  # Keep column types identical across chunks
+                table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)  # Convert chunk to Arrow columns
+                
+                if append_stream is None:
+                    dataset_ref = dataset_future.result()  # Wait for dataset only once the first chunk is ready
+                    staging_ref = dataset_ref.table(staging_id)  # Reference to staging table
+                    
+                    # Decode dictionary columns since each serialized record batch must be self-contained
+                    arrow_schema = pa.schema([field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type) else field for field in table.schema])  # Schema shared by every record batch
+                    table = table.cast(arrow_schema)  # Plain string values instead of dictionary codes
+                    
+                    # Create an empty staging table using the known columns
+                    self.bigquery_client.create_table(bigquery.Table(staging_ref, schema=self.table_schema))  # Create empty staging table
+                    write_session['staging_ref'] = staging_ref  # Registered right away so a failed run can drop it
+                    
+                    # Open a pending stream so rows only become visible once committed
+                    write_stream = bqs_types.WriteStream(type_=bqs_types.WriteStream.Type.PENDING)  # Buffered until commit
+                    write_stream = write_client.create_write_stream(parent=parent, write_stream=write_stream)  # Create stream on the staging table
+                    request_template = bqs_types.AppendRowsRequest(write_stream=write_stream.name)  # Fields sent with the first request
+                    request_template.arrow_rows.writer_schema.serialized_schema = arrow_schema.serialize().to_pybytes()  # Arrow schema for the stream
+                    append_stream = bqs_writer.AppendRowsStream(write_client, request_template)  # Open bidirectional append connection
+                
+                # Send record batches small enough for the API request size limit
+                futures = []  # Pending append responses for this chunk
+                for batch in table.to_batches(max_chunksize=50_000):  # Split chunk into record batches
+                    request = bqs_types.AppendRowsRequest()  # Append request carrying one record batch
+                    request.arrow_rows.rows.serialized_record_batch = batch.serialize().to_pybytes()  # Serialized Arrow rows
+                    futures.append(append_stream.send(request))  # Send without waiting for the previous batch
+                for future in futures:
+                    future.result()  # Wait for every append and check for errors
+                
+                total_rows += len(df)
+                yield df  # Pass chunk on to the data lake step
+            
+            # Close the stream but leave the commit until the upload has finished
+            if append_stream is not None:
+                append_stream.close()  # Close append connection
+                append_stream = None  # Closed normally, nothing left to clean up
+                write_client.finalize_write_stream(name=write_stream.name)  # Mark stream as complete, rows stay invisible
+                write_session.update(  # Everything commit_stream_to_bigquery needs
+                    write_client=write_client,
+                    parent=parent,
+                    stream_name=write_stream.name,
+                    table_ref=dataset_ref.table(self.table_id),
+                    total_rows=total_rows,
+                )
+                print(f"Appended {total_rows} rows to pending BigQuery stream")
+            else:  # Empty source file, the table is emptied by a load job instead
+                print("No rows to stream to BigQuery")
+            
+        except Exception as e:  # Handle any BigQuery errors
+            print(f"Error streaming to BigQuery: {e}")
+            raise  # Re-raise exception to stop pipeline
+        finally:
+            if append_stream is not None:  # Stopped early, shut down the append connection
+                append_stream.close()
+    
+    def commit_stream_to_bigquery(self, write_session):
+        """Commit the pending Storage Write API stream and swap the staged rows into the sales table"""
+        print("Committing streamed data to BigQuery...")
+        
+        try:
+            # Make appended rows visible in the staging table
+            commit_request = bqs_types.BatchCommitWriteStreamsRequest(parent=write_session['parent'], write_streams=[write_session['stream_name']])  # Commit request for the stream
+            response = write_session['write_client'].batch_commit_write_streams(commit_request)  # Commit all appended rows atomically
+            if response.stream_errors:  # Commit is all-or-nothing, so nothing was written
+                raise RuntimeError(f"Storage Write API commit failed: {list(response.stream_errors)}")
+            
+            # Replace the sales table with the staged rows in a single job
+            job_config = bigquery.CopyJobConfig(write_disposition="WRITE_TRUNCATE")  # Replace existing data completely
+            self.bigquery_client.copy_table(write_session['staging_ref'], write_session['table_ref'], job_config=job_config).result()  # Wait for copy and check for errors
+            self.bigquery_client.delete_table(write_session['staging_ref'], not_found_ok=True)  # Remove staging table
+            
+            print(f"Successfully streamed {write_session['total_rows']} rows to BigQuery table: {self.table_id}")
+            
+        except Exception as e:  # Handle any BigQuery errors
+            print(f"Error committing to BigQuery: {e}")
+            raise  # Re-raise exception to stop pipeline
+    
     def run_analytics(self):
         """Execute business intelligence queries on the loaded data"""
         print("Running analytics queries...")
         
-        # Define business intelligence queries
+        # Build table name from configuration; identifiers cannot be query parameters
+        table = f"`{self.project_id}.{self.dataset_id}.{self.table_id}`"  # Fully qualified table name
+        
+        # Define business intelligence queries with deterministic SQL text so repeated runs hit the result cache
         queries = [
             {
                 "name": "Top Performing Products",  # Query description
-                "sql": """
+                "sql": f"""
                 SELECT 
                     product,  -- Product name
                     SUM(total_value) as total_sales,  -- Total revenue per product
                     COUNT(*) as order_count  -- Number of orders per product
-                FROM `symbolic-axe-474621-e8.pedro_etl_demo.sales_data`  -- Fully qualified table name
+                FROM {table}  -- Fully qualified table name
                 GROUP BY product  -- Group results by product
                 ORDER BY total_sales DESC  -- Sort by highest sales first
-                LIMIT 5  -- Return only top 5 products
-                """
+                LIMIT @top_n  -- Return only top products
+                """,
+                "params": [bigquery.ScalarQueryParameter("top_n", "INT64", 5)]  # Number of products to return
             },
             {
                 "name": "Regional Sales Performance",  # Query description
-                "sql": """
+                "sql": f"""
                 SELECT 
                     customer_region,  -- Geographic region
                     SUM(total_value) as total_sales,  -- Total revenue per region
                     AVG(sales_amount) as avg_order_value  -- Average order value per region
-                FROM `symbolic-axe-474621-e8.pedro_etl_demo.sales_data`  -- Source table
+                FROM {table}  -- Source table
                 GROUP BY customer_region  -- Group by geographic region
                 ORDER BY total_sales DESC  -- Sort by highest revenue first
                 """
             }
         ]
         
-        # Execute each analytics query
+        # Submit every analytics query up front so BigQuery runs them in parallel
+        jobs = []  # Submitted query jobs paired with their definitions
         for query in queries:  # Iterate through all defined queries
+            try:
+                job_config = bigquery.QueryJobConfig(  # Set up query job parameters
+                    use_query_cache=True,  # Reuse cached results while the table is unchanged
+                    query_parameters=query.get('params', [])  # Bind values referenced as @name in the SQL
+                )
+                jobs.append((query, self.bigquery_client.query(query['sql'], job_config=job_config)))  # Returns as soon as the job is created
+            except Exception as e:  # Handle query submission errors
+                print(f"Error executing query '{query['name']}': {e}")
+        
+        # Collect results of each analytics query in order
+        for query, job in jobs:  # Iterate through submitted queries
             try:
                 print(f"\nExecuting query: {query['name']}")
-                result = self.bigquery_client.query(query['sql']).result()  # Run SQL query and get results
+                result = job.result()  # Wait for query to finish and get results
                 
-                # Display query results
-                for row in result:  # Iterate through each result row
-                    if query['name'] == "Top Performing Products":  # Format product analysis results
-                        print(f"  {row.product}: ${row.total_sales:,.2f} revenue ({row.order_count} orders)")
-                    else:  # Format regional analysis results
-                        print(f"  {row.customer_region}: ${row.total_sales:,.2f} revenue (avg order: ${row.avg_order_value:,.2f})")
+                # Display query results as a single block
+                if query['name'] == "Top Performing Products":  # Format product analysis results
+                    lines = [f"  {row.product}: ${row.total_sales:,.2f} revenue ({row.order_count} orders)" for row in result]
+                else:  # Format regional analysis results
+                    lines = [f"  {row.customer_region}: ${row.total_sales:,.2f} revenue (avg order: ${row.avg_order_value:,.2f})" for row in result]
+                if lines:  # Skip output for empty results, as before
+                    print("\n".join(lines))
                         
             except Exception as e:  # Handle query execution errors
                 print(f"Error executing query '{query['name']}': {e}")
@@ -179,19 +371,38 @@ class CloudETLPipeline:
         print("=" * 50)
         
         try:
+            # Steps 1-3 are chained lazily so only one chunk is held in memory at a time
             # Step 1: Extract data from source
-            raw_data = self.extract_data(data_file_path)  # Load data from CSV file
+            raw_chunks = self.extract_data(data_file_path)  # Stream data from CSV file
             
             # Step 2: Transform and validate data
-            processed_data = self.transform_data(raw_data)  # Apply business logic and validation
-            
-            # Step 3: Load to cloud storage (data lake)
-            self.load_to_storage(processed_data)  # Upload to Google Cloud Storage
+            processed_chunks = (self.transform_data(chunk) for chunk in raw_chunks)  # Apply business logic and validation per chunk
+            processed_chunks = self.prefetch_chunks(processed_chunks)  # Extract and transform the next chunks while the current one uploads
             
-            # Step 4: Load to data warehouse
-            self.load_to_bigquery(processed_data)  # Insert into BigQuery for analytics
+            with ThreadPoolExecutor(max_workers=1) as executor:  # Background thread for BigQuery setup
+                dataset_future = executor.submit(self.prepare_dataset)  # Create or get dataset while data is processed and uploaded
+                
+                # Step 3: Stream to data warehouse as chunks pass through, if enabled
+                write_session = {}  # Pending Storage Write API stream, filled once every chunk is appended
+                if self.use_storage_write_api:
+                    processed_chunks = self.stream_to_bigquery(processed_chunks, dataset_future, write_session)  # Append each chunk through the Storage Write API
+                
+                # Step 4: Load to cloud storage (data lake)
+                try:
+                    source_uri = self.load_to_storage(processed_chunks)  # Upload to Google Cloud Storage, driving the steps above
+                    
+                    # Step 5: Publish to data warehouse only after the upload succeeded
+                    if 'stream_name' in write_session:
+                        self.commit_stream_to_bigquery(write_session)  # Commit streamed rows and swap them into the sales table
+                    else:  # Batch load job path, or no rows were streamed because the source file was empty
+                        self.load_to_bigquery(source_uri, dataset_future.result())  # Insert into BigQuery for analytics straight from Cloud Storage
+                except Exception:
+                    processed_chunks.close()  # Stop any chunk step left mid-way by the failure
+                    if 'staging_ref' in write_session:  # Staged rows were never published
+                        self.bigquery_client.delete_table(write_session['staging_ref'], not_found_ok=True)  # Remove staging table
+                    raise  # Re-raise exception to stop pipeline
             
-            # Step 5: Generate business insights
+            # Step 6: Generate business insights once every chunk is loaded
             self.run_analytics()  # Execute analytical queries
             
             print("\nETL pipeline completed successfully")